@@ -8,8 +8,12 @@ import requests
 import json
 import sqlite3
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 from difflib import SequenceMatcher
+try:
+    from .mem_budget import next_chunk_size
+except ImportError:  # Run as a script from scrapers/
+    from mem_budget import next_chunk_size
 
 class Mistral7BAnalyzer:
     """Product analyzer using Mistral 7B via Ollama"""
@@ -129,8 +133,55 @@ Format: "Recommendation: [BUY/AVOID/REVIEW]. Analysis: ..."
         
         return results
     
+    def iter_analyze(self, products: Iterable[Dict], amazon_prices: Dict, chunk_size: int = 50,
+                     memory_budget_mb: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Stream analyses for products with bounded memory
+        
+        Unlike batch_analyze, results carry the product ASIN rather than a
+        reference to the whole product, and are saved in fixed-size chunks.
+        
+        Args:
+            products: Any iterable of products, e.g. RetailScraper.iter_scrape()
+            amazon_prices: Amazon price by ASIN
+            chunk_size: Number of analyses written to the database per transaction
+            memory_budget_mb: Shrink chunk_size when RSS exceeds this many MB (None disables)
+        
+        Yields:
+            Analysis dicts as each product is processed
+        """
+        
+        chunk_size = max(1, chunk_size)
+        chunk = []
+        
+        def flush():
+            if chunk:
+                self._save_analyses(chunk)
+                chunk.clear()
+        
+        try:
+            for product in products:
+                asin = product.get('asin', '')
+                amazon_price = amazon_prices.get(asin, product.get('price', 0) * 1.5)
+                
+                analysis = self.analyze_product(product, amazon_price)
+                analysis['asin'] = asin
+                chunk.append(analysis)
+                if len(chunk) >= chunk_size:
+                    flush()
+                
+                yield analysis
+                
+                chunk_size = next_chunk_size(memory_budget_mb, chunk_size, flush)
+        finally:
+            flush()
+    
     def save_analysis(self, product_asin: str, analysis: Dict):
         """Save analysis to database"""
+        self._save_analyses([dict(analysis, asin=product_asin)])
+    
+    def _save_analyses(self, analyses: List[Dict]):
+        """Save analyses to database in a single transaction"""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -148,16 +199,16 @@ Format: "Recommendation: [BUY/AVOID/REVIEW]. Analysis: ..."
                 )
             ''')
             
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT INTO analyses (asin, recommendation, analysis, profit, roi)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (
-                product_asin,
+            ''', [(
+                analysis.get('asin'),
                 analysis.get('recommendation'),
                 analysis.get('analysis'),
                 analysis.get('profit'),
                 analysis.get('roi')
-            ))
+            ) for analysis in analyses])
             
             conn.commit()
             conn.close()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Memory budget helpers for streaming scrape and analysis runs
+Shrinks the DB write chunk size when the process grows past a configured RSS limit
+(this bounds buffered rows only, not the memory used while parsing a page)
+"""
+
+import gc
+import os
+import sys
+from typing import Callable, Optional
+
+_warned = set()
+
+
+def _warn_once(key: str, message: str):
+    """Print a warning to stderr once per process (stdout may be an NDJSON stream)"""
+    if key not in _warned:
+        _warned.add(key)
+        print(message, file=sys.stderr)
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Return the current resident set size of this process in MB
+
+    Only Linux exposes the current (not peak) RSS cheaply via /proc, so this
+    returns None elsewhere (macOS, Windows) and the budget is not enforced.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def next_chunk_size(budget_mb: Optional[float], chunk_size: int,
+                    flush: Optional[Callable] = None) -> int:
+    """
+    Check the memory budget and return the chunk size to use next
+
+    The budget only limits how many rows are buffered between DB writes; it
+    is not backpressure on fetching or parsing, so a large page can still
+    push RSS over budget while its parse tree is alive.
+
+    Never sleeps. When over budget, buffered rows are flushed, garbage is
+    collected and the chunk size is halved. Once the chunk size is 1
+    there is nothing left to shrink, so the check returns immediately.
+
+    Args:
+        budget_mb: Memory budget in MB (None or 0 disables the check)
+        chunk_size: Current number of rows buffered per DB write
+        flush: Called to release buffered data (e.g. write a pending DB chunk)
+
+    Returns:
+        The chunk size to use from now on
+    """
+
+    if not budget_mb or chunk_size <= 1:
+        return chunk_size
+
+    rss = current_rss_mb()
+    if rss is None:
+        _warn_once('unsupported', "Memory budget is not enforced on this platform (no /proc/self/statm)")
+        return chunk_size
+
+    if rss <= budget_mb:
+        return chunk_size
+
+    # Always halve after a flush so GC runs at most once per halving, not per row
+    if flush:
+        flush()
+    gc.collect()
+
+    chunk_size = max(1, chunk_size // 2)
+    print(f"Memory budget exceeded ({rss:.0f} MB > {budget_mb:.0f} MB), "
+          f"reducing DB chunk size to {chunk_size}", file=sys.stderr)
+    return chunk_size
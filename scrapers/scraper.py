@@ -6,13 +6,18 @@ Scrapes Walmart, Target, Walgreens, and Amazon for product data
 
 import requests
 import json
+import sys
 import time
 import sqlite3
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
 from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+try:
+    from .mem_budget import next_chunk_size
+except ImportError:  # Run as a script from scrapers/
+    from mem_budget import next_chunk_size
 
 class RetailScraper:
     """Main scraper class for multiple retailers"""
@@ -89,7 +94,11 @@ class RetailScraper:
     
     def scrape_walmart(self, query: str) -> List[Dict]:
         """Scrape Walmart search results"""
-        products = []
+        return list(self.iter_walmart(query))
+    
+    def iter_walmart(self, query: str) -> Iterator[Dict]:
+        """Yield Walmart search results as they are parsed"""
+        soup = None
         try:
             # Using Walmart search API
             url = f"https://www.walmart.com/search?q={query}"
@@ -99,6 +108,7 @@ class RetailScraper:
             
             # Parse with BeautifulSoup
             soup = BeautifulSoup(response.content, 'html.parser')
+            del response  # Raw HTML is no longer needed once parsed
             
             # Find product tiles (Walmart structure varies, using generic selectors)
             product_tiles = soup.find_all('div', {'data-item-id': True})[:10]
@@ -119,19 +129,26 @@ class RetailScraper:
                             'image_url': '',
                             'asin': f"WALMART_{hash(title.get_text(strip=True))}"
                         }
-                        products.append(product)
-                except:
+                        yield product
+                except Exception:  # Let GeneratorExit through when the consumer stops early
                     continue
         
         except requests.RequestException as e:
-            print(f"Error scraping Walmart: {e}")
+            print(f"Error scraping Walmart: {e}", file=sys.stderr)
+        finally:
+            # Free the parse tree before the next page is fetched
+            if soup is not None:
+                soup.decompose()
         
         time.sleep(2)  # Rate limiting
-        return products
     
     def scrape_target(self, query: str) -> List[Dict]:
         """Scrape Target search results"""
-        products = []
+        return list(self.iter_target(query))
+    
+    def iter_target(self, query: str) -> Iterator[Dict]:
+        """Yield Target search results as they are parsed"""
+        soup = None
         try:
             url = f"https://www.target.com/s?searchTerm={query}"
             
@@ -139,6 +156,7 @@ class RetailScraper:
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
+            del response
             
             # Target uses different structure
             product_cards = soup.find_all('div', {'data-test': 'ProductCard'})[:10]
@@ -158,19 +176,25 @@ class RetailScraper:
                             'image_url': '',
                             'asin': f"TARGET_{hash(title_elem.get_text(strip=True))}"
                         }
-                        products.append(product)
-                except:
+                        yield product
+                except Exception:
                     continue
         
         except requests.RequestException as e:
-            print(f"Error scraping Target: {e}")
+            print(f"Error scraping Target: {e}", file=sys.stderr)
+        finally:
+            if soup is not None:
+                soup.decompose()
         
         time.sleep(2)  # Rate limiting
-        return products
     
     def scrape_walgreens(self, query: str) -> List[Dict]:
         """Scrape Walgreens search results"""
-        products = []
+        return list(self.iter_walgreens(query))
+    
+    def iter_walgreens(self, query: str) -> Iterator[Dict]:
+        """Yield Walgreens search results as they are parsed"""
+        soup = None
         try:
             url = f"https://www.walgreens.com/search/results?q={query}"
             
@@ -178,6 +202,7 @@ class RetailScraper:
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
+            del response
             
             # Walgreens product structure
             product_items = soup.find_all('div', {'class': 'css-product-card'})[:10]
@@ -198,19 +223,25 @@ class RetailScraper:
                             'image_url': '',
                             'asin': f"WALGREENS_{hash(title.get_text(strip=True))}"
                         }
-                        products.append(product)
-                except:
+                        yield product
+                except Exception:
                     continue
         
         except requests.RequestException as e:
-            print(f"Error scraping Walgreens: {e}")
+            print(f"Error scraping Walgreens: {e}", file=sys.stderr)
+        finally:
+            if soup is not None:
+                soup.decompose()
         
         time.sleep(2)  # Rate limiting
-        return products
     
     def scrape_amazon(self, query: str) -> List[Dict]:
         """Scrape Amazon search results"""
-        products = []
+        return list(self.iter_amazon(query))
+    
+    def iter_amazon(self, query: str) -> Iterator[Dict]:
+        """Yield Amazon search results as they are parsed"""
+        soup = None
         try:
             url = f"https://www.amazon.com/s?k={query}"
             
@@ -218,6 +249,7 @@ class RetailScraper:
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
+            del response
             
             # Amazon product structure
             product_divs = soup.find_all('div', {'data-component-type': 's-search-result'})[:10]
@@ -239,37 +271,72 @@ class RetailScraper:
                             'image_url': '',
                             'asin': asin
                         }
-                        products.append(product)
-                except:
+                        yield product
+                except Exception:
                     continue
         
         except requests.RequestException as e:
-            print(f"Error scraping Amazon: {e}")
+            print(f"Error scraping Amazon: {e}", file=sys.stderr)
+        finally:
+            if soup is not None:
+                soup.decompose()
         
         time.sleep(2)  # Rate limiting
     
     def scrape(self, query: str, retailer: str = None) -> List[Dict]:
         """Scrape products from specified retailer"""
-        products = []
-        
-        if retailer == 'walmart':
-            products = self.scrape_walmart(query)
-        elif retailer == 'target':
-            products = self.scrape_target(query)
-        elif retailer == 'walgreens':
-            products = self.scrape_walgreens(query)
-        elif retailer == 'amazon':
-            products = self.scrape_amazon(query)
-        
-        # Save to database
-        self._save_products(products)
-        
-        # Log search
-        self._log_search(query, retailer, len(products))
-        
-        
-        return products
+        return list(self.iter_scrape(query, retailer))
     
+    def iter_scrape(self, query: str, retailer: str = None, chunk_size: int = 50,
+                    memory_budget_mb: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Stream products from specified retailer with bounded memory
+
+        Args:
+            query: Search query
+            retailer: Retailer to scrape
+            chunk_size: Number of products written to the database per transaction
+            memory_budget_mb: Shrink chunk_size when RSS exceeds this many MB (None disables)
+
+        Yields:
+            Product dicts as they are parsed
+        """
+
+        retailers = {
+            'walmart': self.iter_walmart,
+            'target': self.iter_target,
+            'walgreens': self.iter_walgreens,
+            'amazon': self.iter_amazon,
+        }
+        source = retailers.get(retailer)
+
+        chunk_size = max(1, chunk_size)
+        chunk = []
+        results_count = 0
+
+        def flush():
+            if chunk:
+                self._save_products(chunk)
+                chunk.clear()
+
+        try:
+            if source is None:
+                return
+
+            for product in source(query):
+                chunk.append(product)
+                results_count += 1
+                if len(chunk) >= chunk_size:
+                    flush()
+
+                yield product
+
+                chunk_size = next_chunk_size(memory_budget_mb, chunk_size, flush)
+        finally:
+            # Runs on exhaustion and when the consumer stops early
+            flush()
+            self._log_search(query, retailer, results_count)
+
     def _save_products(self, products: List[Dict]):
         """Save products to database"""
         try:
@@ -294,7 +361,7 @@ class RetailScraper:
             conn.commit()
             conn.close()
         except Exception as e:
-            print(f"Error saving products: {e}")
+            print(f"Error saving products: {e}", file=sys.stderr)
     
     def _log_search(self, query: str, retailer: str, results_count: int):
         """Log search to database"""
@@ -310,21 +377,45 @@ class RetailScraper:
             conn.commit()
             conn.close()
         except Exception as e:
-            print(f"Error logging search: {e}")
+            print(f"Error logging search: {e}", file=sys.stderr)
+
+
+def _print_ndjson(products: Iterator[Dict]):
+    """Print one JSON object per line, flushed as each product is parsed"""
+    for product in products:
+        print(json.dumps(product), flush=True)
 
 
 if __name__ == '__main__':
-    import sys
+    import argparse
     
-    if len(sys.argv) > 2:
-        retailer = sys.argv[1]
-        query = sys.argv[2]
-        
+    parser = argparse.ArgumentParser(description='Scrape retailer search results')
+    parser.add_argument('retailer', nargs='?', help='walmart, target, walgreens or amazon')
+    parser.add_argument('query', nargs='?', help='Search query')
+    parser.add_argument('--stream', action='store_true',
+                        help='Print one JSON product per line as they are parsed')
+    parser.add_argument('--chunk-size', type=int, default=50,
+                        help='Products written to the database per transaction (default: 50)')
+    parser.add_argument('--memory-budget-mb', type=float, default=None,
+                        help='Shrink the chunk size when RSS exceeds this many MB (Linux only; '
+                             'bounds buffered DB rows, not memory used while parsing)')
+    args = parser.parse_args()
+    
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    
+    if args.retailer and args.query:
         scraper = RetailScraper()
-        products = scraper.scrape(query, retailer)
         
-        # Output as JSON for Node.js to parse
-        print(json.dumps(products))
+        if args.stream:
+            _print_ndjson(scraper.iter_scrape(args.query, args.retailer, args.chunk_size,
+                                              args.memory_budget_mb))
+        else:
+            products = list(scraper.iter_scrape(args.query, args.retailer, args.chunk_size,
+                                                args.memory_budget_mb))
+            
+            # Output as JSON for Node.js to parse
+            print(json.dumps(products))
     else:
         # Test mode
         scraper = RetailScraper()
@@ -0,0 +1,211 @@
+"""
+Tests for the streaming scrape/analysis paths in scrapers/
+
+Run with: python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import types
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _stub_missing_modules():
+    """Provide minimal stand-ins for optional HTTP/HTML dependencies so no network is needed"""
+    try:
+        import requests, bs4, urllib3  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    class Session:
+        def mount(self, prefix, adapter):
+            pass
+
+    requests_stub = types.ModuleType('requests')
+    requests_stub.Session = Session
+    requests_stub.RequestException = type('RequestException', (IOError,), {})
+    requests_stub.ConnectionError = type('ConnectionError', (requests_stub.RequestException,), {})
+    requests_stub.post = mock.Mock(side_effect=requests_stub.ConnectionError)
+    adapters_stub = types.ModuleType('requests.adapters')
+    adapters_stub.HTTPAdapter = lambda **kwargs: None
+    requests_stub.adapters = adapters_stub
+
+    bs4_stub = types.ModuleType('bs4')
+    bs4_stub.BeautifulSoup = object
+
+    urllib3_stub = types.ModuleType('urllib3')
+    util_stub = types.ModuleType('urllib3.util')
+    retry_stub = types.ModuleType('urllib3.util.retry')
+    retry_stub.Retry = lambda **kwargs: None
+
+    sys.modules.update({
+        'requests': requests_stub,
+        'requests.adapters': adapters_stub,
+        'bs4': bs4_stub,
+        'urllib3': urllib3_stub,
+        'urllib3.util': util_stub,
+        'urllib3.util.retry': retry_stub,
+    })
+
+
+_stub_missing_modules()
+
+from scrapers import mem_budget  # noqa: E402
+from scrapers.analyzer import Mistral7BAnalyzer  # noqa: E402
+from scrapers.scraper import RetailScraper, _print_ndjson  # noqa: E402
+
+
+def _fake_products(count=7):
+    return [{
+        'title': f'Test product {i}',
+        'retailer': 'walmart',
+        'price': 10.0 + i,
+        'original_price': 10.0 + i,
+        'url': '',
+        'image_url': '',
+        'asin': f'TEST_{i}'
+    } for i in range(count)]
+
+
+class DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.products = _fake_products()
+
+        self.scraper = RetailScraper(self.db_path)
+        self.scraper.iter_walmart = lambda query: iter(self.products)
+        self.scraper.iter_amazon = lambda query: iter(self.products)
+
+        self.conn = sqlite3.connect(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.db_path)
+
+    def count(self, table):
+        return self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+class IterScrapeTests(DatabaseTestCase):
+    def test_writes_full_chunks_while_streaming(self):
+        stream = self.scraper.iter_scrape('test', 'walmart', chunk_size=3)
+        for _ in range(4):
+            next(stream)
+
+        self.assertEqual(self.count('products'), 3)
+        stream.close()
+
+    def test_close_early_saves_pending_chunk_and_logs_search(self):
+        stream = self.scraper.iter_scrape('test', 'walmart', chunk_size=3)
+        for _ in range(4):
+            next(stream)
+        stream.close()
+
+        self.assertEqual(self.count('products'), 4)
+        self.assertEqual(
+            self.conn.execute('SELECT query, retailer, results_count FROM search_history').fetchall(),
+            [('test', 'walmart', 4)]
+        )
+
+    def test_scrape_returns_list_for_amazon(self):
+        self.assertEqual(self.scraper.scrape('test', 'amazon'), self.products)
+        self.assertEqual(self.count('products'), len(self.products))
+
+    def test_scrape_unknown_retailer_returns_empty_list_and_logs(self):
+        self.assertEqual(self.scraper.scrape('test', 'unknown'), [])
+        self.assertEqual(self.count('search_history'), 1)
+
+    def test_chunk_size_below_one_is_clamped(self):
+        stream = self.scraper.iter_scrape('test', 'walmart', chunk_size=0)
+        next(stream)
+
+        self.assertEqual(self.count('products'), 1)
+        stream.close()
+
+    def test_stream_prints_one_json_product_per_line(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            _print_ndjson(self.scraper.iter_scrape('test', 'walmart'))
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.products)
+
+
+class IterAnalyzeTests(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.analyzer = Mistral7BAnalyzer()
+        self.analyzer.db_path = self.db_path
+        self.analyzer.analyze_product = self._fallback
+
+    def _fallback(self, product, amazon_price):
+        return self.analyzer._fallback_analysis(product, amazon_price, product['price'])
+
+    def test_writes_analyses_in_chunks(self):
+        analyses = self.analyzer.iter_analyze(iter(self.products), {}, chunk_size=3)
+        first = [next(analyses) for _ in range(3)]
+
+        self.assertEqual(self.count('analyses'), 3)
+        self.assertEqual(first[0]['asin'], 'TEST_0')
+        self.assertNotIn('product', first[0])
+
+        self.assertEqual(len(list(analyses)), 4)
+        self.assertEqual(self.count('analyses'), len(self.products))
+
+    def test_close_early_saves_pending_chunk(self):
+        analyses = self.analyzer.iter_analyze(iter(self.products), {}, chunk_size=3)
+        for _ in range(4):
+            next(analyses)
+        analyses.close()
+
+        self.assertEqual(self.count('analyses'), 4)
+
+    def test_save_analysis_uses_given_asin(self):
+        self.analyzer.save_analysis('B000TEST', self._fallback(self.products[0], 30.0))
+
+        self.assertEqual(
+            self.conn.execute('SELECT asin FROM analyses').fetchall(),
+            [('B000TEST',)]
+        )
+
+
+class NextChunkSizeTests(unittest.TestCase):
+    def test_disabled_budget_keeps_chunk_size(self):
+        self.assertEqual(mem_budget.next_chunk_size(None, 50), 50)
+
+    def test_under_budget_keeps_chunk_size(self):
+        with mock.patch.object(mem_budget, 'current_rss_mb', return_value=10.0):
+            self.assertEqual(mem_budget.next_chunk_size(100, 50), 50)
+
+    def test_over_budget_flushes_and_halves(self):
+        flush = mock.Mock()
+        with mock.patch.object(mem_budget, 'current_rss_mb', return_value=200.0), \
+                mock.patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(mem_budget.next_chunk_size(100, 50, flush), 25)
+        flush.assert_called_once()
+
+    def test_floor_returns_without_collecting(self):
+        with mock.patch.object(mem_budget, 'current_rss_mb', return_value=200.0) as rss, \
+                mock.patch.object(mem_budget.gc, 'collect') as collect:
+            self.assertEqual(mem_budget.next_chunk_size(100, 1), 1)
+        rss.assert_not_called()
+        collect.assert_not_called()
+
+    def test_unmeasurable_rss_skips_budget(self):
+        with mock.patch.object(mem_budget, 'current_rss_mb', return_value=None), \
+                mock.patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(mem_budget.next_chunk_size(100, 50), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()